@@ -9,13 +9,300 @@ Usage:
 """
 
 import subprocess
-import re
 import os
 import signal
 import sys
-import argparse
 import time
-from typing import List, Dict, Optional, Tuple
+import ctypes
+import shutil
+import csv
+import functools
+import io
+import threading
+import weakref
+from collections import deque
+from typing import List, Dict, Iterable, NamedTuple, Optional, Tuple
+
+
+NVML_SUCCESS = 0
+NVML_ERROR_INSUFFICIENT_SIZE = 7
+# R570+ drivers report usedGpuMemory as u64::MAX when it is not available
+NVML_VALUE_NOT_AVAILABLE = 0xFFFFFFFFFFFFFFFF
+NVML_PROCESS_NAME_LEN = 256
+
+# Samples kept per GPU while streaming from a long-lived nvidia-smi
+STREAM_HISTORY = 16
+
+# How long clear_gpu_memory waits for signalled processes to exit
+EXIT_TIMEOUT = 1.0
+EXIT_POLL_INTERVAL = 0.02
+
+# Query results are reused for this long, e.g. between --clear and its re-display
+CACHE_TTL_MS = 200
+# Keys shared by the sync getters and the asyncio status path
+MEMORY_CACHE_KEY = 'memory'
+PROCESSES_CACHE_KEY = 'processes'
+
+# uuid rides along so --query-compute-apps rows can be mapped to GPU indices
+MEMORY_QUERY_ARGS = ('--query-gpu=index,memory.used,memory.total,memory.free,uuid',
+                     '--format=csv,noheader,nounits')
+# pmon samples for a full second by design, so it is only a fallback
+PMON_ARGS = ('pmon', '-c', '1', '-s', 'um')
+PMON_DEFAULT_COLUMNS = ('gpu', 'pid', 'type', 'sm', 'mem', 'enc', 'dec', 'fb', 'command')
+COMPUTE_APPS_ARGS = ('--query-compute-apps=pid,process_name,gpu_uuid,used_memory',
+                     '--format=csv,noheader,nounits')
+
+
+class GpuProc(NamedTuple):
+    gpu_id: str
+    pid: str
+    command: str = 'N/A'
+    # MiB; pmon falls back to memory utilisation (%) if it has no fb column
+    memory: str = 'N/A'
+    type: str = 'N/A'
+    gpu_uuid: str = ''
+
+
+class GpuMem(NamedTuple):
+    gpu_id: str
+    used_mb: int
+    total_mb: int
+    free_mb: int
+    # Usage in tenths of a percent, e.g. 83 == 8.3%
+    usage_tenths: int
+    uuid: str = ''
+    
+    @classmethod
+    def from_mb(cls, gpu_id: str, used_mb: int, total_mb: int, free_mb: int,
+                uuid: str = '') -> 'GpuMem':
+        if total_mb > 0:
+            # round(used_mb / total_mb * 1000) without going through floats
+            usage_tenths = (used_mb * 2000 + total_mb) // (2 * total_mb)
+        else:
+            usage_tenths = 0
+        return cls(gpu_id, used_mb, total_mb, free_mb, usage_tenths, uuid)
+
+
+def _parse_memory_row(row: List[str]) -> Optional[GpuMem]:
+    # index, memory.used, memory.total, memory.free[, uuid]
+    if len(row) < 4:
+        return None
+    try:
+        return GpuMem.from_mb(row[0], int(row[1]), int(row[2]), int(row[3]),
+                              row[4] if len(row) > 4 else '')
+    except ValueError:
+        return None
+
+
+def _parse_memory(output: str) -> List[GpuMem]:
+    memory_info = []
+    for row in csv.reader(io.StringIO(output), skipinitialspace=True):
+        gpu = _parse_memory_row(row)
+        if gpu is not None:
+            memory_info.append(gpu)
+    return memory_info
+
+
+def _parse_pmon(output: str) -> List[GpuProc]:
+    # `pmon -s um` prints gpu pid type sm mem enc dec fb command, and newer
+    # drivers add columns (jpg, ofa, ccpm...), so the layout comes from the
+    # '# gpu pid ... command' header rather than fixed positions
+    gpu_idx, pid_idx, type_idx, mem_idx, cmd_idx = _pmon_layout(PMON_DEFAULT_COLUMNS)
+    processes = []
+    for line in output.splitlines():
+        line = line.lstrip()
+        if not line:
+            continue
+        if line[0] == '#':
+            names = line[1:].split()
+            # The second header line holds units (Idx, #, C/G, %, MB, name)
+            if 'pid' in names and 'command' in names:
+                gpu_idx, pid_idx, type_idx, mem_idx, cmd_idx = _pmon_layout(names)
+            continue
+        # Split only up to the command so names containing spaces stay whole
+        fields = line.split(None, cmd_idx)
+        if len(fields) < cmd_idx:
+            continue
+        pid = fields[pid_idx]
+        # Idle GPUs are reported with pid '-'
+        if not pid.isdigit():
+            continue
+        processes.append(GpuProc(
+            gpu_id=fields[gpu_idx],
+            pid=pid,
+            command=fields[cmd_idx].rstrip() if len(fields) > cmd_idx else 'N/A',
+            memory=fields[mem_idx],
+            type=fields[type_idx]
+        ))
+    return processes
+
+
+def _pmon_layout(columns) -> Tuple[int, int, int, int, int]:
+    # Framebuffer MiB when pmon reports it, otherwise memory utilisation (%)
+    mem = 'fb' if 'fb' in columns else 'mem'
+    return tuple(columns.index(name) for name in ('gpu', 'pid', 'type', mem, 'command'))
+
+
+def _parse_compute_apps(output: str, index_by_uuid: Dict[str, str]) -> List[GpuProc]:
+    processes = []
+    for row in csv.reader(io.StringIO(output), skipinitialspace=True):
+        if len(row) >= 4:
+            processes.append(GpuProc(
+                gpu_id=index_by_uuid.get(row[2], 'N/A'),
+                pid=row[0],
+                command=row[1],
+                memory=row[3],
+                type='C',
+                gpu_uuid=row[2]
+            ))
+    return processes
+
+
+def _ttl_cache(key: str, ms: int = CACHE_TTL_MS):
+    """Memoise a no-argument GPUMemoryCleaner method under ``key`` for ``ms`` milliseconds."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self):
+            cached = self._cached(key)
+            if cached is not None:
+                return cached
+            return self._remember(key, method(self), ms)
+        return wrapper
+    return decorator
+
+
+class _NVMLError(RuntimeError):
+
+    def __init__(self, func: str, code: int):
+        super().__init__(f"{func} failed with NVML error code {code}")
+        self.code = code
+
+
+class _nvmlMemory_t(ctypes.Structure):
+    _fields_ = [
+        ('total', ctypes.c_ulonglong),
+        ('free', ctypes.c_ulonglong),
+        ('used', ctypes.c_ulonglong),
+    ]
+
+
+class _nvmlProcessInfo_t(ctypes.Structure):
+    _fields_ = [
+        ('pid', ctypes.c_uint),
+        ('usedGpuMemory', ctypes.c_ulonglong),
+        ('gpuInstanceId', ctypes.c_uint),
+        ('computeInstanceId', ctypes.c_uint),
+    ]
+
+
+class _NVMLBackend:
+    """In-process access to libnvidia-ml, avoiding an nvidia-smi fork per query."""
+
+    def __init__(self, lib: ctypes.CDLL):
+        self._lib = lib
+        self._init = lib.nvmlInit_v2
+        self._shutdown = lib.nvmlShutdown
+        self._get_count = lib.nvmlDeviceGetCount_v2
+        self._get_handle = lib.nvmlDeviceGetHandleByIndex_v2
+        self._get_memory_info = lib.nvmlDeviceGetMemoryInfo
+        self._get_compute_procs = lib.nvmlDeviceGetComputeRunningProcesses_v3
+        self._get_graphics_procs = lib.nvmlDeviceGetGraphicsRunningProcesses_v3
+        self._get_process_name = lib.nvmlSystemGetProcessName
+
+        self._device_handles: list = []
+        self._initialized = False
+
+    @classmethod
+    def load(cls) -> Optional['_NVMLBackend']:
+        # Only resolves symbols; NVML itself is initialised on first use
+        try:
+            return cls(ctypes.CDLL('libnvidia-ml.so.1'))
+        except (OSError, AttributeError):
+            return None
+
+    @staticmethod
+    def _check(func: str, ret: int):
+        if ret != NVML_SUCCESS:
+            raise _NVMLError(func, ret)
+
+    def init(self):
+        self._check('nvmlInit_v2', self._init())
+        self._initialized = True
+
+    def shutdown(self):
+        if self._initialized:
+            self._initialized = False
+            # Handles are only valid while NVML is initialised
+            self._device_handles = []
+            self._shutdown()
+
+    def _handles(self) -> list:
+        # Resolved on first use and reused for every later query
+        if not self._device_handles:
+            count = ctypes.c_uint(0)
+            self._check('nvmlDeviceGetCount_v2', self._get_count(ctypes.byref(count)))
+            handles = []
+            for index in range(count.value):
+                handle = ctypes.c_void_p()
+                self._check('nvmlDeviceGetHandleByIndex_v2',
+                            self._get_handle(index, ctypes.byref(handle)))
+                handles.append(handle)
+            self._device_handles = handles
+        return self._device_handles
+
+    def _running_processes(self, getter, name: str, handle) -> List[_nvmlProcessInfo_t]:
+        count = ctypes.c_uint(0)
+        ret = getter(handle, ctypes.byref(count), None)
+        while ret == NVML_ERROR_INSUFFICIENT_SIZE:
+            # Leave headroom for processes started between the two calls
+            count = ctypes.c_uint(count.value * 2 + 1)
+            infos = (_nvmlProcessInfo_t * count.value)()
+            ret = getter(handle, ctypes.byref(count), infos)
+            if ret == NVML_SUCCESS:
+                return infos[:count.value]
+        self._check(name, ret)
+        return []
+
+    def _process_name(self, pid: int) -> str:
+        buf = ctypes.create_string_buffer(NVML_PROCESS_NAME_LEN)
+        if self._get_process_name(pid, buf, NVML_PROCESS_NAME_LEN) != NVML_SUCCESS:
+            return 'N/A'
+        return buf.value.decode('utf-8', 'replace') or 'N/A'
+
+    def get_memory_usage(self) -> List[GpuMem]:
+        memory_info = []
+        for index, handle in enumerate(self._handles()):
+            mem = _nvmlMemory_t()
+            self._check('nvmlDeviceGetMemoryInfo',
+                        self._get_memory_info(handle, ctypes.byref(mem)))
+            memory_info.append(GpuMem.from_mb(str(index),
+                                              mem.used // (1024 * 1024),
+                                              mem.total // (1024 * 1024),
+                                              mem.free // (1024 * 1024)))
+        return memory_info
+
+    def get_gpu_processes(self) -> List[GpuProc]:
+        processes = []
+        for index, handle in enumerate(self._handles()):
+            by_pid = {}
+            for proc_type, getter, name in (
+                    ('C', self._get_compute_procs, 'nvmlDeviceGetComputeRunningProcesses_v3'),
+                    ('G', self._get_graphics_procs, 'nvmlDeviceGetGraphicsRunningProcesses_v3')):
+                for info in self._running_processes(getter, name, handle):
+                    if info.pid in by_pid:
+                        by_pid[info.pid] = by_pid[info.pid]._replace(type='C+G')
+                        continue
+                    if info.usedGpuMemory == NVML_VALUE_NOT_AVAILABLE:
+                        memory = 'N/A'
+                    else:
+                        memory = str(info.usedGpuMemory // (1024 * 1024))
+                    by_pid[info.pid] = GpuProc(gpu_id=str(index),
+                                               pid=str(info.pid),
+                                               command=self._process_name(info.pid),
+                                               memory=memory,
+                                               type=proc_type)
+            processes.extend(by_pid.values())
+        return processes
 
 
 class GPUMemoryCleaner:
@@ -23,106 +310,219 @@ class GPUMemoryCleaner:
     
     def __init__(self, verbose: bool = False):
         self.verbose = verbose
+        self._nvml = _NVMLBackend.load()
+        self._nvml_finalizer: Optional[weakref.finalize] = None
+        # Absolute path, resolved once: skips PATH lookups and lets subprocess use posix_spawn
+        self._nvsmi = shutil.which('nvidia-smi')
         self.nvidia_smi_available = self._check_nvidia_smi()
+        self._stream_proc: Optional[subprocess.Popen] = None
+        self._stream_thread: Optional[threading.Thread] = None
+        self._stream_samples: Dict[str, deque] = {}
+        self._stream_lock = threading.Lock()
+        self._gpu_index_by_uuid: Optional[Dict[str, str]] = None
+        self._cache: Dict[str, Tuple[float, object]] = {}
     
-    def _check_nvidia_smi(self) -> bool:
-         
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        
+        self.stop_streaming()
+        self._release_nvml()
+    
+    def _ensure_nvml(self):
+        
+        # Initialised on first use and kept until close(), so device handles
+        # are fetched once and reused by every later query
+        if self._nvml is None or self._nvml_finalizer is not None:
+            return
         try:
-            subprocess.run(['nvidia-smi', '--version'], 
-                         capture_output=True, check=True)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+            self._nvml.init()
+        except _NVMLError as e:
+            self._log(f"NVML unavailable, falling back to nvidia-smi: {e}")
+            self._nvml = None
+            return
+        # Shuts NVML down if the cleaner is collected or the interpreter exits
+        # without close(), without keeping the cleaner itself alive
+        self._nvml_finalizer = weakref.finalize(self, self._nvml.shutdown)
+    
+    def _release_nvml(self):
+        
+        if self._nvml_finalizer is not None:
+            self._nvml_finalizer()
+            self._nvml_finalizer = None
+    
+    def _check_nvidia_smi(self) -> bool:
+        
+        return self._nvsmi is not None
+    
+    def _nvidia_smi_path(self) -> str:
+        
+        if self._nvsmi is None:
+            raise RuntimeError("nvidia-smi not found. Make sure NVIDIA drivers are installed.")
+        return self._nvsmi
     
     def _log(self, message: str):
         
         if self.verbose:
             print(f"[GPU-CLEANER] {message}")
     
-    def get_gpu_processes(self) -> List[Dict[str, str]]:
-        if not self.nvidia_smi_available:
-            raise RuntimeError("nvidia-smi not found. Make sure NVIDIA drivers are installed.")
+    def _query_nvidia_smi(self, args) -> str:
+        
+        # Read raw bytes and decode once; stderr is never used so don't buffer it
+        # close_fds=False is required for posix_spawn; our own fds are non-inheritable anyway
+        result = subprocess.run([self._nvidia_smi_path(), *args], stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, close_fds=False, check=True)
+        return result.stdout.decode('utf-8', 'replace')
+    
+    def _cached(self, key: str):
         
+        entry = self._cache.get(key)
+        if entry is not None and time.monotonic() < entry[0]:
+            return entry[1]
+        return None
+    
+    def _remember(self, key: str, value, ms: int = CACHE_TTL_MS):
+        
+        self._cache[key] = (time.monotonic() + ms / 1000, value)
+        return value
+    
+    def invalidate_cache(self):
+        
+        self._cache.clear()
+    
+    def _query_nvml(self, query):
+        
+        # None means the caller should fall back to nvidia-smi
+        self._ensure_nvml()
+        if self._nvml is None:
+            return None
         try:
-            # Run nvidia-smi to get process information
-            cmd = ['nvidia-smi', 'pmon', '-c', '1', '-s', 'um']
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            
-            processes = []
-            lines = result.stdout.strip().split('\n')
-            
-            # Skip header lines
-            data_lines = [line for line in lines if not line.startswith('#') and line.strip()]
-            
-            for line in data_lines:
-                # Parse the output: gpu pid type sm mem enc dec command
-                parts = line.split()
-                if len(parts) >= 7:
-                    processes.append({
-                        'gpu_id': parts[0],
-                        'pid': parts[1],
-                        'type': parts[2],
-                        'sm': parts[3],
-                        'mem': parts[4],
-                        'enc': parts[5],
-                        'dec': parts[6],
-                        'command': ' '.join(parts[7:]) if len(parts) > 7 else 'N/A'
-                    })
-            
-            # Alternative method using nvidia-smi query if pmon doesn't work
-            if not processes:
-                processes = self._get_processes_alternative()
-                
-            return processes
-            
-        except subprocess.CalledProcessError as e:
-            self._log(f"Error running nvidia-smi: {e}")
-            return self._get_processes_alternative()
+            return query(self._nvml)
+        except _NVMLError as e:
+            self._log(f"NVML query failed, falling back to nvidia-smi: {e}")
+            return None
+    
+    @_ttl_cache(PROCESSES_CACHE_KEY)
+    def get_gpu_processes(self) -> List[GpuProc]:
+        if self._nvml is not None:
+            processes = self._query_nvml(_NVMLBackend.get_gpu_processes)
+            if processes is not None:
+                return processes
+
+        for args, parse in self._process_queries():
+            try:
+                processes = parse(self._query_nvidia_smi(args))
+            except subprocess.CalledProcessError as e:
+                self._log(f"Error running nvidia-smi: {e}")
+                continue
+            if processes is not None:
+                return processes
+        return []
     
-    def _get_processes_alternative(self) -> List[Dict[str, str]]:
-         
+    def _process_queries(self):
+        
+        # nvidia-smi fallback chain shared by the sync and async paths; a parser
+        # returning None moves on to the next query
+        return ((COMPUTE_APPS_ARGS, self._parse_compute_apps),
+                (PMON_ARGS, _parse_pmon))
+    
+    def _parse_compute_apps(self, output: str) -> Optional[List[GpuProc]]:
+        
+        # Rows carry GPU uuids; without the uuid -> index mapping fall back to pmon
+        index_by_uuid = self._gpu_indices()
+        return _parse_compute_apps(output, index_by_uuid) if index_by_uuid else None
+    
+    def _learn_gpu_indices(self, memory_info: List[GpuMem]):
+        
+        # GPU indices don't change while we run, remember them once
+        if self._gpu_index_by_uuid is None:
+            index_by_uuid = {gpu.uuid: gpu.gpu_id for gpu in memory_info if gpu.uuid}
+            if index_by_uuid:
+                self._gpu_index_by_uuid = index_by_uuid
+    
+    def _gpu_indices(self) -> Dict[str, str]:
+        
+        if self._gpu_index_by_uuid is None:
+            self._learn_gpu_indices(self.get_memory_usage())
+        return self._gpu_index_by_uuid or {}
+    
+    def start_streaming(self, interval_ms: int = 500):
+        """Keep one nvidia-smi sampling every interval_ms instead of spawning per query."""
+        if self._stream_proc is not None:
+            return
+        self._ensure_nvml()
+        if self._nvml is not None:
+            self._log("NVML backend active, streaming not needed")
+            return
+        cmd = [self._nvidia_smi_path(), *MEMORY_QUERY_ARGS, '-lms', str(interval_ms)]
+        # Spawned once and long-lived, so keep close_fds: it must not hold on
+        # to descriptors the embedding application marked inheritable
+        self._stream_proc = subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                                             stderr=subprocess.DEVNULL,
+                                             bufsize=1, text=True)
+        self._stream_thread = threading.Thread(target=self._read_stream,
+                                               args=(self._stream_proc,),
+                                               daemon=True)
+        self._stream_thread.start()
+        self._log(f"Streaming GPU memory every {interval_ms}ms (PID {self._stream_proc.pid})")
+    
+    def _read_stream(self, proc: subprocess.Popen):
+        
+        for row in csv.reader(proc.stdout, skipinitialspace=True):
+            sample = _parse_memory_row(row)
+            if sample is None:
+                continue
+            with self._stream_lock:
+                history = self._stream_samples.get(sample.gpu_id)
+                if history is None:
+                    history = self._stream_samples[sample.gpu_id] = deque(maxlen=STREAM_HISTORY)
+                history.append(sample)
+    
+    def stop_streaming(self):
+        
+        proc, self._stream_proc = self._stream_proc, None
+        if proc is None:
+            return
+        proc.terminate()
         try:
-            cmd = ['nvidia-smi', '--query-compute-apps=pid,process_name,gpu_uuid,used_memory', 
-                   '--format=csv,noheader,nounits']
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            
-            processes = []
-            for line in result.stdout.strip().split('\n'):
-                if line.strip():
-                    parts = [part.strip() for part in line.split(',')]
-                    if len(parts) >= 4:
-                        processes.append({
-                            'pid': parts[0],
-                            'command': parts[1],
-                            'gpu_uuid': parts[2],
-                            'memory': parts[3],
-                            'gpu_id': '0'  # Default, could be enhanced
-                        })
-            
-            return processes
-            
-        except subprocess.CalledProcessError:
+            proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        if self._stream_thread is not None:
+            self._stream_thread.join()
+            self._stream_thread = None
+        proc.stdout.close()
+        with self._stream_lock:
+            self._stream_samples.clear()
+    
+    def _latest_stream_snapshot(self) -> List[GpuMem]:
+        
+        if self._stream_proc is None or self._stream_proc.poll() is not None:
             return []
+        with self._stream_lock:
+            return [self._stream_samples[gpu_id][-1]
+                    for gpu_id in sorted(self._stream_samples, key=int)]
     
-    def get_memory_usage(self) -> List[Dict[str, str]]:
-         
+    @_ttl_cache(MEMORY_CACHE_KEY)
+    def get_memory_usage(self) -> List[GpuMem]:
+        snapshot = self._latest_stream_snapshot()
+        if snapshot:
+            self._learn_gpu_indices(snapshot)
+            return snapshot
+
+        if self._nvml is not None:
+            memory_info = self._query_nvml(_NVMLBackend.get_memory_usage)
+            if memory_info is not None:
+                return memory_info
+
         try:
-            cmd = ['nvidia-smi', '--query-gpu=index,memory.used,memory.total,memory.free', 
-                   '--format=csv,noheader,nounits']
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            
-            memory_info = []
-            for line in result.stdout.strip().split('\n'):
-                if line.strip():
-                    parts = [part.strip() for part in line.split(',')]
-                    if len(parts) >= 4:
-                        memory_info.append({
-                            'gpu_id': parts[0],
-                            'used': parts[1],
-                            'total': parts[2],
-                            'free': parts[3]
-                        })
-            
+            memory_info = _parse_memory(self._query_nvidia_smi(MEMORY_QUERY_ARGS))
+            self._learn_gpu_indices(memory_info)
             return memory_info
             
         except subprocess.CalledProcessError:
@@ -139,19 +539,22 @@ class GPUMemoryCleaner:
             else:
                 os.kill(pid_int, signal.SIGTERM)
                 self._log(f"Terminated process {pid}")
+            # Anything queried before the signal is now stale
+            self.invalidate_cache()
             return True
         except (ValueError, ProcessLookupError, PermissionError) as e:
             self._log(f"Failed to terminate process {pid}: {e}")
             return False
     
-    def clear_gpu_memory(self, gpu_ids: Optional[List[str]] = None, 
-                        exclude_pids: Optional[List[str]] = None,
+    def clear_gpu_memory(self, gpu_ids: Optional[Iterable[str]] = None, 
+                        exclude_pids: Optional[Iterable[str]] = None,
                         force: bool = False,
                         dry_run: bool = False) -> Tuple[int, int]:
         
 
-        if exclude_pids is None:
-            exclude_pids = []
+        # Sets make the per-process filters below O(1) lookups
+        gpu_ids = frozenset(gpu_ids) if gpu_ids is not None else None
+        exclude_pids = frozenset(exclude_pids or ())
         
         processes = self.get_gpu_processes()
         
@@ -159,12 +562,17 @@ class GPUMemoryCleaner:
             self._log("No GPU processes found")
             return 0, 0
         
+        # Only compute clients are cleared, whichever backend listed them:
+        # graphics-only ones (Xorg, compositors) are left alone
+        processes = [p for p in processes if p.type != 'G']
+        
         # Filter processes by GPU ID if specified
-        if gpu_ids:
-            processes = [p for p in processes if p.get('gpu_id') in gpu_ids]
+        if gpu_ids is not None:
+            processes = [p for p in processes if p.gpu_id in gpu_ids]
         
         # Filter out excluded PIDs
-        processes = [p for p in processes if p.get('pid') not in exclude_pids]
+        if exclude_pids:
+            processes = [p for p in processes if p.pid not in exclude_pids]
         
         processes_found = len(processes)
         processes_terminated = 0
@@ -172,49 +580,181 @@ class GPUMemoryCleaner:
         if dry_run:
             print(f"DRY RUN: Would terminate {processes_found} processes:")
             for proc in processes:
-                print(f"  PID: {proc.get('pid')}, Command: {proc.get('command', 'N/A')}")
+                print(f"  PID: {proc.pid}, Command: {proc.command}")
             return processes_found, 0
         
+        signalled = []
         for proc in processes:
-            pid = proc.get('pid')
-            if pid and self.terminate_process(pid, force):
+            if proc.pid and self.terminate_process(proc.pid, force):
                 processes_terminated += 1
+                signalled.append(int(proc.pid))
         
-        # Wait a moment for processes to actually terminate
-        if processes_terminated > 0:
-            time.sleep(1)
+        # Wait for processes to actually terminate, but no longer than needed
+        if signalled:
+            remaining = self._wait_for_exit(signalled, EXIT_TIMEOUT)
+            if remaining:
+                self._log(f"Still running after {EXIT_TIMEOUT}s: "
+                          f"{', '.join(str(pid) for pid in sorted(remaining))}")
         
         return processes_found, processes_terminated
     
-    def display_status(self):
+    @staticmethod
+    def _process_alive(pid: int) -> bool:
+        
+        # An exited child of ours stays a zombie until its owner (e.g. a Popen)
+        # waits on it; peek without reaping so the exit status stays theirs
+        try:
+            if os.waitid(os.P_PID, pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) is not None:
+                return False
+        except ChildProcessError:
+            pass
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+    
+    def _wait_for_exit(self, pids: List[int], timeout: float) -> set:
+        
+        pending = set(pids)
+        deadline = time.monotonic() + timeout
+        while True:
+            pending = {pid for pid in pending if self._process_alive(pid)}
+            if not pending or time.monotonic() >= deadline:
+                return pending
+            time.sleep(EXIT_POLL_INTERVAL)
+    
+    async def _run_nvidia_smi(self, args) -> Optional[str]:
+        
+        import asyncio
+        
+        proc = await asyncio.create_subprocess_exec(self._nvidia_smi_path(), *args,
+                                                    stdout=asyncio.subprocess.PIPE,
+                                                    stderr=asyncio.subprocess.DEVNULL,
+                                                    close_fds=False)
+        stdout, _ = await proc.communicate()
+        if proc.returncode != 0:
+            self._log(f"nvidia-smi {' '.join(args)} exited with status {proc.returncode}")
+            return None
+        return stdout.decode('utf-8', 'replace')
+    
+    async def _memory_task(self) -> List[GpuMem]:
+        
+        if self._nvml is not None or self._stream_proc is not None:
+            # Served without spawning nvidia-smi
+            return self.get_memory_usage()
+        cached = self._cached(MEMORY_CACHE_KEY)
+        if cached is not None:
+            return cached
+        output = await self._run_nvidia_smi(MEMORY_QUERY_ARGS)
+        memory_info = _parse_memory(output) if output is not None else []
+        self._learn_gpu_indices(memory_info)
+        return self._remember(MEMORY_CACHE_KEY, memory_info)
+    
+    async def _processes_task(self, memory: Optional['asyncio.Future'] = None) -> List[GpuProc]:
+        
+        if self._nvml is not None:
+            return self.get_gpu_processes()
+        cached = self._cached(PROCESSES_CACHE_KEY)
+        if cached is not None:
+            return cached
+        return self._remember(PROCESSES_CACHE_KEY, await self._query_processes_async(memory))
+    
+    async def _query_processes_async(self, memory: Optional['asyncio.Future'] = None) -> List[GpuProc]:
+        
+        import asyncio
+        
+        pending = None
+        if self._gpu_index_by_uuid is None:
+            # The memory query also learns the uuid -> index mapping
+            pending = memory if memory is not None else self._memory_task()
+        for args, parse in self._process_queries():
+            if pending is not None:
+                output, _ = await asyncio.gather(self._run_nvidia_smi(args), pending)
+                pending = None
+            else:
+                output = await self._run_nvidia_smi(args)
+            processes = parse(output) if output is not None else None
+            if processes is not None:
+                return processes
+        return []
+    
+    async def display_status_async(self, show_processes: bool = True):
+        
+        import asyncio
+        
+        # Shared with the process query so memory is only fetched once
+        memory = asyncio.ensure_future(self._memory_task())
+        processes = None
+        if show_processes:
+            try:
+                processes = await self._processes_task(memory)
+            except BaseException:
+                memory.cancel()
+                raise
+        self._print_status(await memory, processes)
+    
+    def display_status(self, show_processes: bool = True):
+        
+        # Only overlap the queries when both would spawn nvidia-smi; NVML and
+        # streaming answer in-process, and asyncio is costly to import
+        if show_processes and self._nvml is None and self._stream_proc is None:
+            import asyncio
+            
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                asyncio.run(self.display_status_async(show_processes))
+                return
+        
+        # Sequential path, also used inside a running event loop (e.g. Jupyter)
+        processes = self.get_gpu_processes() if show_processes else None
+        self._print_status(self.get_memory_usage(), processes)
+    
+    def _print_status(self, memory_info: List[GpuMem],
+                      processes: Optional[List[GpuProc]]):
         
         print("=== GPU Memory Status ===")
         
-        memory_info = self.get_memory_usage()
         if memory_info:
             for gpu in memory_info:
-                used_mb = int(gpu['used'])
-                total_mb = int(gpu['total'])
-                free_mb = int(gpu['free'])
-                usage_percent = (used_mb / total_mb) * 100 if total_mb > 0 else 0
-                
-                print(f"GPU {gpu['gpu_id']}: {used_mb}MB / {total_mb}MB "
-                      f"({usage_percent:.1f}% used, {free_mb}MB free)")
+                print(f"GPU {gpu.gpu_id}: {gpu.used_mb}MB / {gpu.total_mb}MB "
+                      f"({gpu.usage_tenths // 10}.{gpu.usage_tenths % 10}% used, {gpu.free_mb}MB free)")
         
-        print("\n=== GPU Processes ===")
-        processes = self.get_gpu_processes()
+        if processes is not None:
+            print()
+            self._print_processes(processes)
+    
+    def display_processes(self):
+        
+        self._print_processes(self.get_gpu_processes())
+    
+    def _print_processes(self, processes: List[GpuProc]):
+        
+        print("=== GPU Processes ===")
         if processes:
             for proc in processes:
-                print(f"PID: {proc.get('pid'):<8} "
-                      f"GPU: {proc.get('gpu_id', 'N/A'):<3} "
-                      f"Memory: {proc.get('memory', proc.get('mem', 'N/A')):<8} "
-                      f"Command: {proc.get('command', 'N/A')}")
+                print(f"PID: {proc.pid:<8} "
+                      f"GPU: {proc.gpu_id:<3} "
+                      f"Memory: {proc.memory:<8} "
+                      f"Command: {proc.command}")
         else:
             print("No GPU processes found")
 
 
-def main():
-     
+def _split_arg(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    # "0,1," -> ('0', '1'); empty entries are dropped here rather than filtered later
+    if not value:
+        return None
+    return tuple(s for s in (part.strip() for part in value.split(',')) if s)
+
+
+def _build_parser():
+    # argparse is only needed by the CLI, keep it off the import path of the module
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description="Clear NVIDIA GPU memory by terminating processes",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -243,8 +783,12 @@ Examples:
                        help='Show what would be done without actually doing it')
     parser.add_argument('--verbose', '-v', action='store_true',
                        help='Enable verbose output')
-    
-    args = parser.parse_args()
+    return parser
+
+
+def main():
+     
+    args = _build_parser().parse_args()
     
      
     if not (args.status or args.clear):
@@ -253,27 +797,36 @@ Examples:
     cleaner = GPUMemoryCleaner(verbose=args.verbose)
     
     try:
-        if args.status:
-            cleaner.display_status()
-        
-        if args.clear:
-            gpu_ids = args.gpu.split(',') if args.gpu else None
-            exclude_pids = args.exclude.split(',') if args.exclude else None
+        # One NVML init/shutdown for the whole run; close() on exit shuts it down
+        with cleaner:
+            if args.status:
+                # With --clear the process list is shown after clearing instead,
+                # reusing the query the clear step makes
+                cleaner.display_status(show_processes=not args.clear)
             
-            found, terminated = cleaner.clear_gpu_memory(
-                gpu_ids=gpu_ids,
-                exclude_pids=exclude_pids,
-                force=args.force,
-                dry_run=args.dry_run
-            )
+            if args.clear:
+                gpu_ids = _split_arg(args.gpu)
+                exclude_pids = _split_arg(args.exclude)
+                
+                found, terminated = cleaner.clear_gpu_memory(
+                    gpu_ids=gpu_ids,
+                    exclude_pids=exclude_pids,
+                    force=args.force,
+                    dry_run=args.dry_run
+                )
+                
+                if args.dry_run:
+                    print(f"\nDry run complete. Found {found} processes to terminate.")
+                else:
+                    print(f"\nCleared {terminated}/{found} GPU processes.")
+                    if terminated > 0:
+                        print("\nUpdated GPU status:")
+                        cleaner.display_status()
             
-            if args.dry_run:
-                print(f"\nDry run complete. Found {found} processes to terminate.")
-            else:
-                print(f"\nCleared {terminated}/{found} GPU processes.")
-                if terminated > 0:
-                    print("\nUpdated GPU status:")
-                    cleaner.display_status()
+                if args.status and (args.dry_run or terminated == 0):
+                    # Nothing changed, so the list --clear just fetched is still current
+                    print()
+                    cleaner.display_processes()
     
     except KeyboardInterrupt:
         print("\nOperation cancelled by user.")
@@ -16,13 +16,12 @@ setup(
     install_requires=[
         # No dependencies  
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.7',
     classifiers=[
         "Development Status :: 1 - Beta",
         "Intended Audience :: Developers,Scientists,Enthusiasts",
         "License :: OSI Approved :: MIT License",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
@@ -70,7 +69,7 @@ gpu-clean --clear --dry-run
 
 - NVIDIA GPU with drivers installed
 - nvidia-smi command available
-- Python 3.6+
+- Python 3.7+
 """,
     long_description_content_type="text/markdown",
 )
\ No newline at end of file